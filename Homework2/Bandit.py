@@ -2,30 +2,38 @@
 import logging
 from abc import ABC, abstractmethod
 from logs import *  # Make sure to import CustomFormatter from logs module
-import random
-import csv
+import matplotlib
+matplotlib.use('Agg')  # render straight to files, no GUI event loop
 import matplotlib.pyplot as plt
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from numba import njit
 
-logging.basicConfig  # This line doesn't do anything, you can remove it
 logger = logging.getLogger("MAB Application")
 
-# create console handler with a higher log level
-ch = logging.StreamHandler()
-ch.setLevel(logging.DEBUG)
+def configure_logging():
+    # only called from __main__, so importing this module (tests, worker
+    # processes) never installs handlers
+    if logger.handlers:
+        return
+    # create console handler with a higher log level
+    ch = logging.StreamHandler()
+    ch.setLevel(logging.DEBUG)
 
-ch.setFormatter(CustomFormatter())
+    ch.setFormatter(CustomFormatter())
 
-logger.addHandler(ch)
+    logger.addHandler(ch)
 
 class Bandit(ABC):
     ##==== DO NOT REMOVE ANYTHING FROM THIS CLASS ====##
 
     @abstractmethod
     def __init__(self, true_means):
-        self.true_means = true_means  # true means of each
-        self.estimated_means = [0.0] * len(true_means)  # estimated means of each
-        self.action_counts = [0] * len(true_means)  # number of times each is pulled
+        self.true_means = np.asarray(true_means, dtype=np.float64)  # true means of each
+        self.estimated_means = np.zeros(len(true_means))  # estimated means of each
+        self.action_counts = np.zeros(len(true_means), dtype=np.int64)  # number of times each is pulled
+        self.k = len(true_means)  # number of arms
+        self.best_true = max(true_means)  # best true mean, used for regret
 
     @abstractmethod
     def __repr__(self):
@@ -39,9 +47,18 @@ class Bandit(ABC):
     def update(self):
         pass
 
-    @abstractmethod
-    def experiment(self):
-        pass
+    def experiment(self, num_trials):
+        # generic pull/update loop; subclasses with a jitted kernel override this
+        pull = self.pull
+        update = self.update
+        true_means = self.true_means
+        rewards = np.empty(num_trials)
+        for t in range(num_trials):
+            arm = pull()
+            reward = true_means[arm]
+            update(arm, reward)
+            rewards[t] = reward
+        return rewards
 
     @abstractmethod
     def report(self):
@@ -50,57 +67,113 @@ class Bandit(ABC):
         # print average regret (use f strings to make it informative)
         pass
 
+#--------------------------------------#
+# jitted experiment loops; the per-arm state arrays are updated in place and
+# all random draws come from the bandit's own np.random.Generator
+
+@njit(cache=True)
+def _eps_greedy_loop(true_means, explore, explore_arms, values, counts):
+    num_trials = explore.shape[0]
+    best_arm = int(values.argmax())
+    best_value = values[best_arm]
+    rewards = np.empty(num_trials)
+    for t in range(num_trials):
+        if explore[t]:
+            arm = explore_arms[t]
+        else:
+            arm = best_arm
+        reward = true_means[arm]
+        counts[arm] += 1
+        values[arm] += (reward - values[arm]) / counts[arm]
+        if values[arm] >= best_value:
+            best_arm = arm
+            best_value = values[arm]
+        elif arm == best_arm:
+            best_arm = int(values.argmax())
+            best_value = values[best_arm]
+        rewards[t] = reward
+    return rewards, best_arm
+
+
+@njit(cache=True)
+def _ts_loop(true_means, num_trials, rng, alpha, beta):
+    k = true_means.shape[0]
+    samples = np.empty(k)
+    rewards = np.empty(num_trials)
+    for t in range(num_trials):
+        for i in range(k):
+            samples[i] = rng.beta(alpha[i], beta[i])
+        arm = int(samples.argmax())
+        reward = true_means[arm]
+        # ThompsonSampling.update inlined: one store into alpha or beta, no call
+        if reward == 1:
+            alpha[arm] += 1
+        else:
+            beta[arm] += 1
+        rewards[t] = reward
+    return rewards
+
 #--------------------------------------#
 
 class EpsilonGreedy(Bandit):
-    def __init__(self, true_means, epsilon=0.2):
+    def __init__(self, true_means, epsilon=0.2, seed=None):
         super().__init__(true_means)
         self.epsilon = epsilon
-        self.true_means = true_means
-        self.action_counts = [0] * len(true_means)
-        self.action_values = [0.0] * len(true_means)
+        self.rng = np.random.default_rng(seed)
+        self.action_values = np.zeros(self.k, dtype=np.float64)
+        # greedy arm is tracked on update instead of rescanning action_values on every pull
+        self._best_arm = 0
+        self._best_value = 0.0
 
     def __repr__(self):
         return f"EpsilonGreedy Bandit with epsilon={self.epsilon}"
 
     def pull(self):
-        if random.random() < self.epsilon:
-            return random.randint(0, len(self.true_means) - 1)
+        if self.rng.random() < self.epsilon:
+            return int(self.rng.integers(0, self.k))
         else:
-            return self.action_values.index(max(self.action_values))
+            return self._best_arm
 
     def update(self, arm, reward):
         self.action_counts[arm] += 1
         n = self.action_counts[arm]
         self.action_values[arm] += (1 / n) * (reward - self.action_values[arm])
+        value = self.action_values[arm]
+        if value >= self._best_value:
+            self._best_arm = arm
+            self._best_value = value
+        elif arm == self._best_arm:
+            self._best_arm = int(self.action_values.argmax())
+            self._best_value = self.action_values[self._best_arm]
 
     def experiment(self, num_trials):
-        rewards = []
-        for _ in range(num_trials):
-            arm = self.pull()
-            reward = self.true_means[arm]
-            self.update(arm, reward)
-            rewards.append(reward)
+        # explore/exploit decisions and explore arms are drawn for all trials at once
+        explore = self.rng.random(num_trials) < self.epsilon
+        explore_arms = self.rng.integers(0, self.k, num_trials)
+        rewards, self._best_arm = _eps_greedy_loop(self.true_means, explore, explore_arms,
+                                                   self.action_values, self.action_counts)
+        self._best_value = self.action_values[self._best_arm]
         return rewards
 
     def report(self):
-        avg_reward = sum(self.action_values) / len(self.action_values)
-        avg_regret = max(self.true_means) - avg_reward
+        avg_reward = self.action_values.mean()
+        avg_regret = self.best_true - avg_reward
         return f"EpsilonGreedy Results: Average Reward={avg_reward:.2f}, Average Regret={avg_regret:.2f}"
 
 #--------------------------------------#
 class ThompsonSampling(Bandit):
-    def __init__(self, true_means):
+    def __init__(self, true_means, seed=None):
         super().__init__(true_means)
-        self.alpha = [1] * len(true_means)
-        self.beta = [1] * len(true_means)
+        self.rng = np.random.default_rng(seed)
+        self.alpha = np.ones(self.k, dtype=np.float64)
+        self.beta = np.ones(self.k, dtype=np.float64)
 
     def __repr__(self):
         return "ThompsonSampling Bandit"
 
     def pull(self):
-        sampled_means = [random.betavariate(self.alpha[i], self.beta[i]) for i in range(len(self.true_means))]
-        return sampled_means.index(max(sampled_means))
+        sampled_means = self.rng.beta(self.alpha, self.beta)
+        return int(sampled_means.argmax())
 
     def update(self, arm, reward):
         if reward == 1:
@@ -109,17 +182,11 @@ class ThompsonSampling(Bandit):
             self.beta[arm] += 1
 
     def experiment(self, num_trials):
-        rewards = []
-        for _ in range(num_trials):
-            arm = self.pull()
-            reward = self.true_means[arm]
-            self.update(arm, reward)
-            rewards.append(reward)
-        return rewards
+        return _ts_loop(self.true_means, num_trials, self.rng, self.alpha, self.beta)
 
     def report(self):
-        avg_reward = sum(self.alpha) / (sum(self.alpha) + sum(self.beta))
-        avg_regret = max(self.true_means) - avg_reward
+        avg_reward = self.alpha.sum() / (self.alpha.sum() + self.beta.sum())
+        avg_regret = self.best_true - avg_reward
         return f"ThompsonSampling Results: Average Reward={avg_reward:.2f}, Average Regret={avg_regret:.2f}"
 
 #--------------------------------------#
@@ -129,59 +196,78 @@ num_trials = 20000
 #--------------------------------------#
 class Visualization:
 
-    def plot1(self, epsilon_greedy_rewards, thompson_rewards):
-        plt.figure(figsize=(12, 6))
-        plt.subplot(1, 2, 1)
-        cumulative_epsilon_greedy_rewards = np.cumsum(epsilon_greedy_rewards)
-        cumulative_thompson_rewards = np.cumsum(thompson_rewards)
-        plt.plot(cumulative_epsilon_greedy_rewards, label="Epsilon-Greedy")
-        plt.plot(cumulative_thompson_rewards, label="Thompson Sampling")
-        plt.xlabel("Trials")
-        plt.ylabel("Cumulative Reward")
-        plt.legend()
-
-        plt.subplot(1, 2, 2)
-        plt.plot(np.log(cumulative_epsilon_greedy_rewards), label="Epsilon-Greedy (log scale)")
-        plt.plot(np.log(cumulative_thompson_rewards), label="Thompson Sampling (log scale)")
-        plt.xlabel("Trials")
-        plt.ylabel("Cumulative Reward (log scale)")
-        plt.legend()
-
-        plt.show()
-
-    def plot2(self, epsilon_greedy_rewards, thompson_rewards):
-
-        plt.figure(figsize=(12, 6))
-        cumulative_epsilon_greedy_rewards = [sum(epsilon_greedy_rewards[:i+1]) for i in range(len(epsilon_greedy_rewards))]
-        cumulative_thompson_rewards = [sum(thompson_rewards[:i+1]) for i in range(len(thompson_rewards))]
-
-        plt.plot(range(len(cumulative_epsilon_greedy_rewards)), cumulative_epsilon_greedy_rewards, label="Epsilon-Greedy")
-        plt.plot(range(len(cumulative_thompson_rewards)), cumulative_thompson_rewards, label="Thompson Sampling")
-        plt.xlabel("Trials")
-        plt.ylabel("Cumulative Reward")
-        plt.title("Cumulative Rewards")
-        plt.legend()
-        plt.show()
+    @staticmethod
+    def _cum(rewards):
+        return np.cumsum(np.asarray(rewards))
+
+    def _cumulative(self, epsilon_greedy_rewards, thompson_rewards,
+                    cumulative_epsilon_greedy_rewards, cumulative_thompson_rewards):
+        # reuse cumulative sums computed by the caller, otherwise derive them here
+        if cumulative_epsilon_greedy_rewards is None:
+            cumulative_epsilon_greedy_rewards = self._cum(epsilon_greedy_rewards)
+        if cumulative_thompson_rewards is None:
+            cumulative_thompson_rewards = self._cum(thompson_rewards)
+        return cumulative_epsilon_greedy_rewards, cumulative_thompson_rewards
+
+    def plot1(self, epsilon_greedy_rewards, thompson_rewards,
+              cumulative_epsilon_greedy_rewards=None, cumulative_thompson_rewards=None):
+        cumulative_epsilon_greedy_rewards, cumulative_thompson_rewards = self._cumulative(
+            epsilon_greedy_rewards, thompson_rewards, cumulative_epsilon_greedy_rewards, cumulative_thompson_rewards)
+
+        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+        ax1.plot(cumulative_epsilon_greedy_rewards, label="Epsilon-Greedy")
+        ax1.plot(cumulative_thompson_rewards, label="Thompson Sampling")
+        ax1.set_xlabel("Trials")
+        ax1.set_ylabel("Cumulative Reward")
+        ax1.legend()
+
+        ax2.plot(np.log(cumulative_epsilon_greedy_rewards), label="Epsilon-Greedy (log scale)")
+        ax2.plot(np.log(cumulative_thompson_rewards), label="Thompson Sampling (log scale)")
+        ax2.set_xlabel("Trials")
+        ax2.set_ylabel("Cumulative Reward (log scale)")
+        ax2.legend()
+
+        fig.savefig('cumulative_rewards_log.png', dpi=100)
+        plt.close(fig)
+
+    def plot2(self, epsilon_greedy_rewards, thompson_rewards,
+              cumulative_epsilon_greedy_rewards=None, cumulative_thompson_rewards=None):
+        cumulative_epsilon_greedy_rewards, cumulative_thompson_rewards = self._cumulative(
+            epsilon_greedy_rewards, thompson_rewards, cumulative_epsilon_greedy_rewards, cumulative_thompson_rewards)
+
+        fig, ax = plt.subplots(figsize=(12, 6))
+        ax.plot(range(len(cumulative_epsilon_greedy_rewards)), cumulative_epsilon_greedy_rewards, label="Epsilon-Greedy")
+        ax.plot(range(len(cumulative_thompson_rewards)), cumulative_thompson_rewards, label="Thompson Sampling")
+        ax.set_xlabel("Trials")
+        ax.set_ylabel("Cumulative Reward")
+        ax.set_title("Cumulative Rewards")
+        ax.legend()
+        fig.savefig('cumulative_rewards.png', dpi=100)
+        plt.close(fig)
 
     def store_rewards_to_csv(self, epsilon_greedy_rewards, thompson_rewards):
 
-        with open('bandit_rewards.csv', mode='w', newline='') as csv_file:
-            fieldnames = ['Bandit', 'Reward', 'Algorithm']
-            writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for reward in epsilon_greedy_rewards:
-                writer.writerow({'Bandit': 'EpsilonGreedy', 'Reward': reward, 'Algorithm': 'Epsilon-Greedy'})
-
-            for reward in thompson_rewards:
-                writer.writerow({'Bandit': 'ThompsonSampling', 'Reward': reward, 'Algorithm': 'Thompson Sampling'})
-
-    def report_cumulative_reward_and_regret(self, epsilon_greedy_rewards, thompson_rewards):
-
-        cumulative_epsilon_greedy_reward = sum(epsilon_greedy_rewards)
-        cumulative_thompson_reward = sum(thompson_rewards)
-        cumulative_epsilon_greedy_regret = max(true_means) * len(epsilon_greedy_rewards) - cumulative_epsilon_greedy_reward
-        cumulative_thompson_regret = max(true_means) * len(thompson_rewards) - cumulative_thompson_reward
+        # label columns are constant per algorithm, so only the reward is formatted per row;
+        # shortest round-trip repr: 0.1 stays '0.1' and integer rewards are written as '1'.
+        # Lines end in CRLF like the csv module's default dialect.
+        with open('bandit_rewards.csv', mode='wb') as csv_file:
+            csv_file.write(b'Bandit,Reward,Algorithm\r\n')
+            prefix, suffix = b'EpsilonGreedy,', b',Epsilon-Greedy\r\n'
+            csv_file.writelines(prefix + np.format_float_positional(r, trim='-').encode() + suffix for r in epsilon_greedy_rewards)
+            prefix, suffix = b'ThompsonSampling,', b',Thompson Sampling\r\n'
+            csv_file.writelines(prefix + np.format_float_positional(r, trim='-').encode() + suffix for r in thompson_rewards)
+
+    def report_cumulative_reward_and_regret(self, epsilon_greedy_rewards, thompson_rewards,
+                                            cumulative_epsilon_greedy_rewards=None, cumulative_thompson_rewards=None):
+        best = max(true_means)
+        cumulative_epsilon_greedy_rewards, cumulative_thompson_rewards = self._cumulative(
+            epsilon_greedy_rewards, thompson_rewards, cumulative_epsilon_greedy_rewards, cumulative_thompson_rewards)
+
+        # empty inputs total 0, as sum([]) did
+        cumulative_epsilon_greedy_reward = cumulative_epsilon_greedy_rewards[-1] if cumulative_epsilon_greedy_rewards.size else 0.0
+        cumulative_thompson_reward = cumulative_thompson_rewards[-1] if cumulative_thompson_rewards.size else 0.0
+        cumulative_epsilon_greedy_regret = best * cumulative_epsilon_greedy_rewards.size - cumulative_epsilon_greedy_reward
+        cumulative_thompson_regret = best * cumulative_thompson_rewards.size - cumulative_thompson_reward
 
         print(f'Cumulative Reward - Epsilon-Greedy: {cumulative_epsilon_greedy_reward}')
         print(f'Cumulative Reward - Thompson Sampling: {cumulative_thompson_reward}')
@@ -189,25 +275,70 @@ class Visualization:
         print(f'Cumulative Regret - Thompson Sampling: {cumulative_thompson_regret}')
 
 #--------------------------------------#
-def comparison(num_trials):
+# module-level so comparison_multi can pickle them into worker processes
+
+def _run_eps(args):
+    true_means, epsilon, num_trials, seed = args
+    return EpsilonGreedy(true_means, epsilon, seed=seed).experiment(num_trials)
+
+def _run_ts(args):
+    true_means, num_trials, seed = args
+    return ThompsonSampling(true_means, seed=seed).experiment(num_trials)
+
+def comparison(num_trials, seed=None):
 
     epsilon = 0.2
-    epsilon_greedy_bandit = EpsilonGreedy(true_means, epsilon)
-    thompson_bandit = ThompsonSampling(true_means)
+    # independent child seeds, one per experiment
+    seed_e, seed_t = np.random.SeedSequence(seed).spawn(2)
 
-    epsilon_greedy_rewards = epsilon_greedy_bandit.experiment(num_trials)
-    thompson_rewards = thompson_bandit.experiment(num_trials)
+    # both jitted runs finish in milliseconds, so a process pool would only add startup cost
+    epsilon_greedy_rewards = _run_eps((true_means, epsilon, num_trials, seed_e))
+    thompson_rewards = _run_ts((true_means, num_trials, seed_t))
 
     vis = Visualization()
-    vis.plot1(epsilon_greedy_rewards, thompson_rewards)
-    vis.plot2(epsilon_greedy_rewards, thompson_rewards)
+    # cumulative sums are computed once and shared by the plots and the report
+    cumulative = (vis._cum(epsilon_greedy_rewards), vis._cum(thompson_rewards))
+    vis.plot1(epsilon_greedy_rewards, thompson_rewards, *cumulative)
+    vis.plot2(epsilon_greedy_rewards, thompson_rewards, *cumulative)
     vis.store_rewards_to_csv(epsilon_greedy_rewards, thompson_rewards)
-    vis.report_cumulative_reward_and_regret(epsilon_greedy_rewards, thompson_rewards)
+    vis.report_cumulative_reward_and_regret(epsilon_greedy_rewards, thompson_rewards, *cumulative)
+
+def comparison_multi(num_trials, num_seeds=32, workers=None, seed=None):
+
+    if num_trials < 1:
+        raise ValueError(f"num_trials must be at least 1, got {num_trials}")
+    if num_seeds < 1:
+        raise ValueError(f"num_seeds must be at least 1, got {num_seeds}")
+
+    epsilon = 0.2
+    runners = {'eps': _run_eps, 'ts': _run_ts}
+    # independent child seeds, one per (algorithm, repetition) run
+    children = np.random.SeedSequence(seed).spawn(2 * num_seeds)
+    tasks = []
+    for seed_e, seed_t in zip(children[::2], children[1::2]):
+        tasks.append(('eps', (true_means, epsilon, num_trials, seed_e)))
+        tasks.append(('ts', (true_means, num_trials, seed_t)))
+
+    # every (algorithm, seed) run is independent, so spread them over all workers
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        futures = [(kind, ex.submit(runners[kind], args)) for kind, args in tasks]
+        results = [(kind, fut.result()) for kind, fut in futures]
+
+    # mean cumulative regret per algorithm, averaged over seeds
+    optimal = max(true_means) * np.arange(1, num_trials + 1)
+    mean_regret = {}
+    for kind in ('eps', 'ts'):
+        cumulative = np.stack([np.cumsum(rewards) for k, rewards in results if k == kind])
+        mean_regret[kind] = (optimal - cumulative).mean(axis=0)
+
+    print(f'Mean Cumulative Regret over {num_seeds} seeds - Epsilon-Greedy: {mean_regret["eps"][-1]}')
+    print(f'Mean Cumulative Regret over {num_seeds} seeds - Thompson Sampling: {mean_regret["ts"][-1]}')
+    return mean_regret
 
 if __name__ == "__main__":
+    configure_logging()
     comparison(num_trials)
 
-if __name__=='__main__':
     logger.debug("debug message")
     logger.info("info message")
     logger.warning("warning message")